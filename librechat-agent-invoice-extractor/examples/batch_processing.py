@@ -3,128 +3,725 @@
 Batch Invoice Processing Example
 
 Process all PDF invoices in a folder and save extracted data.
+Invoices are uploaded and extracted concurrently (see --concurrency),
+using asyncio when aiohttp is installed and a thread pool otherwise.
 
 Usage:
     python batch_processing.py --folder ./invoices --vendors vendors.json
+
+Requirements:
+    pip install requests
+    pip install aiohttp  # optional, asyncio pipeline instead of threads
+    pip install orjson  # optional, faster JSON
 """
 
 import argparse
-import json
+import asyncio
+import contextlib
+import hashlib
+import itertools
+import os
+import queue
+import sqlite3
 import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    import aiohttp  # noqa: F401
+except ImportError:  # fall back to the thread pool
+    aiohttp = None
 
 # Import from parent directory
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from librechat_invoice_extractor import LibreChatInvoiceExtractor
+from librechat_invoice_extractor import (
+    AsyncLibreChatInvoiceExtractor,
+    LibreChatInvoiceExtractor,
+    json_dumps,
+    json_loads,
+    load_vendor_mappings,
+)
 
+# Number of invoices in flight at once
+DEFAULT_CONCURRENCY = 8
 
-def process_invoice_folder(
-    folder_path: str,
-    vendors_file: str,
-    librechat_url: str,
-    email: str,
-    password: str,
-    output_folder: str = None
-):
+# Extraction results are cached here by PDF content hash
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'librechat_invoice'
+
+# Block size used when hashing PDFs
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """BLAKE2b content hash of a file, read in 1 MB blocks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class _ExtractionCache:
     """
-    Process all PDF invoices in a folder.
+    Persistent cache of extraction results keyed by PDF content hash.
     
-    Args:
-        folder_path: Path to folder containing PDF invoices
-        vendors_file: Path to JSON file with vendor mappings
-        librechat_url: LibreChat server URL
-        email: Login email
-        password: Login password
-        output_folder: Optional output folder (defaults to same as input)
+    Duplicate scans (re-sent invoices, retries) are served from disk
+    instead of being uploaded and extracted again. Entries are also keyed
+    by the prompt, so changing the vendor mappings invalidates them.
+    With read=False, lookups always miss but results are still stored, to
+    refresh the cache. Safe to use from several threads.
     """
-    # Initialize client
-    client = LibreChatInvoiceExtractor(librechat_url)
     
-    # Login
-    print(f"Logging in to {librechat_url}...")
-    if not client.login(email, password):
-        print("❌ Login failed")
-        return
+    def __init__(self, cache_dir: Path, prompt: str, read: bool = True):
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.prompt_key = hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+        self.read = read
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(cache_dir / 'extractions.sqlite3'), check_same_thread=False)
+        try:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS extractions ('
+                ' digest TEXT NOT NULL, prompt TEXT NOT NULL, data BLOB NOT NULL,'
+                ' PRIMARY KEY (digest, prompt))'
+            )
+            self._db.commit()
+        except sqlite3.Error:
+            self._db.close()
+            raise
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+    
+    def lookup(self, pdf_path: Path) -> Tuple[str, Optional[dict]]:
+        """
+        Hash pdf_path and look up a cached result.
+        
+        Errors reading the file or the database (e.g. another batch holding
+        the lock) are treated as a cache miss, so the invoice is still
+        uploaded and extracted.
+        
+        Returns:
+            (digest, invoice_data), invoice_data is None on a cache miss and
+            digest is None if the file could not be hashed
+        """
+        try:
+            digest = file_digest(pdf_path)
+        except OSError as e:
+            print(f"  ⚠ {pdf_path.name}: Could not hash file for the cache: {e}")
+            return None, None
+        if not self.read:
+            return digest, None
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    'SELECT data FROM extractions WHERE digest = ? AND prompt = ?',
+                    (digest, self.prompt_key)
+                ).fetchone()
+            return digest, (json_loads(row[0]) if row else None)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"  ⚠ {pdf_path.name}: Could not read cache: {e}")
+            return digest, None
+    
+    def store(self, digest: str, invoice_data: dict):
+        """Cache invoice_data for the PDF with the given digest."""
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO extractions (digest, prompt, data) VALUES (?, ?, ?)',
+                (digest, self.prompt_key, json_dumps(invoice_data))
+            )
+            self._db.commit()
+
+
+def _write_file(path: Path, data: bytes):
+    """
+    Atomically replace path with data.
+    
+    Writes a temporary file next to path and renames it into place, so an
+    interrupted run never leaves a truncated result that resume would
+    mistake for a finished one.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def _iter_pdfs(folder: Path, output_dir: Path, resume: bool, skipped: List[Path]) -> Iterator[Path]:
+    """
+    Lazily yield the PDF files in folder.
+    
+    Uses os.scandir, whose entries already carry the file type, instead of
+    globbing. With resume, PDFs whose JSON result already exists in
+    output_dir are skipped so an interrupted batch can be restarted; they
+    are appended to skipped instead of being yielded.
+    """
+    done = set()
+    if resume:
+        with os.scandir(output_dir) as entries:
+            done = {entry.name for entry in entries if entry.name.endswith('.json')}
+    
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.endswith('.pdf') or not entry.is_file():
+                continue
+            if name[:-4] + '.json' in done:
+                print(f"↷ Skipping {name} (already extracted)")
+                skipped.append(Path(entry.path))
+                continue
+            yield Path(entry.path)
+
+
+def _load_batch(
+    folder_path: str,
+    vendors_file: str,
+    output_folder: Optional[str],
+    resume: bool = True
+) -> Optional[Tuple[Mapping[str, str], Iterator[Path], List[Path], Path]]:
+    """
+    Load vendor mappings and find the PDFs to process.
     
+    Returns:
+        (vendors, pdfs, skipped, output_dir), or None if the folder has no
+        PDFs. pdfs is a lazy iterator, so large folders are never listed in
+        memory; skipped collects the already extracted PDFs as it is consumed.
+    """
     # Load vendor mappings
-    with open(vendors_file, 'r', encoding='utf-8') as f:
-        vendors = json.load(f)
+    if not Path(vendors_file).exists():
+        print(f"❌ Vendors file not found: {vendors_file}")
+        return None
+    vendors = load_vendor_mappings(vendors_file)
     print(f"✓ Loaded {len(vendors)} vendor mappings")
     
-    # Find all PDFs
+    # Check the input folder before creating an output folder for it
     folder = Path(folder_path)
-    pdfs = list(folder.glob("*.pdf"))
-    print(f"✓ Found {len(pdfs)} PDF files")
-    
-    if not pdfs:
+    if not folder.is_dir():
         print("No PDF files found in folder")
-        return
+        return None
     
     # Determine output folder
     output_dir = Path(output_folder) if output_folder else folder
     output_dir.mkdir(exist_ok=True)
     
-    # Process each PDF
-    results = []
-    for i, pdf_path in enumerate(pdfs, 1):
-        print(f"\n[{i}/{len(pdfs)}] Processing: {pdf_path.name}")
-        
-        try:
-            # Upload PDF
-            file_data = client.upload_file(str(pdf_path))
-            if not file_data:
-                print(f"  ❌ Upload failed")
-                continue
-            
-            # Extract data
-            invoice_data = client.extract_invoice(file_data, vendors)
-            if not invoice_data:
-                print(f"  ❌ Extraction failed")
-                continue
-            
-            # Save result
-            output_path = output_dir / pdf_path.with_suffix('.json').name
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(invoice_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"  ✓ Saved: {output_path}")
-            print(f"  - Vendor: {invoice_data.get('vendor')}")
-            print(f"  - Invoice: {invoice_data.get('invoice_number')}")
-            print(f"  - Total: {invoice_data.get('total_amount')} {invoice_data.get('currency')}")
-            
-            results.append({
-                'file': pdf_path.name,
-                'status': 'success',
-                'data': invoice_data
-            })
+    # Find all PDFs
+    skipped = []
+    pdfs = _iter_pdfs(folder, output_dir, resume, skipped)
+    first = next(pdfs, None)
+    if first is None:
+        if not skipped:
+            print("No PDF files found in folder")
+            return None
+        # Still write a summary covering the earlier results
+        print("✓ All PDF files already extracted")
+        return vendors, iter(()), skipped, output_dir
+    return vendors, itertools.chain([first], pdfs), skipped, output_dir
+
+
+class _ResultWriter(threading.Thread):
+    """
+    Background thread that writes per-invoice JSON files.
+    
+    Keeps disk latency off the upload/extract path: workers submit
+    (output_path, invoice_data) and move on. Files are written as compact
+    JSON unless pretty is set; only batch_summary.json is always indented,
+    since it is meant to be read by people. Fresh extractions are also added
+    to the extraction cache, if any. Use as a context manager, which
+    starts the thread and waits for pending writes on exit.
+    """
+    
+    def __init__(self, cache: Optional[_ExtractionCache] = None, pretty: bool = False):
+        super().__init__(name="invoice-writer", daemon=True)
+        self.cache = cache
+        self.pretty = pretty
+        self.queue = queue.Queue()
+        self.errors: Dict[Path, str] = {}
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.queue.put(None)
+        self.join()
+    
+    def submit(self, output_path: Path, invoice_data: dict, digest: Optional[str] = None):
+        """Queue invoice_data to be written to output_path (and cached under digest)."""
+        self.queue.put((output_path, invoice_data, digest))
+    
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            output_path, invoice_data, digest = item
+            try:
+                _write_file(output_path, json_dumps(invoice_data, indent=self.pretty))
+                print(f"  ✓ Saved: {output_path}")
+            except Exception as e:
+                print(f"  ❌ {output_path.name}: Error: {e}")
+                self.errors[output_path] = str(e)
             
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            results.append({
-                'file': pdf_path.name,
-                'status': 'error',
-                'error': str(e)
-            })
-    
-    # Summary
+            if digest is not None and self.cache is not None:
+                try:
+                    self.cache.store(digest, invoice_data)
+                except sqlite3.Error as e:
+                    print(f"  ⚠ {output_path.name}: Could not cache result: {e}")
+
+
+def _error_message(e: Exception) -> str:
+    """Error text for the batch summary; timeouts have an empty str()."""
+    if isinstance(e, asyncio.TimeoutError):
+        return "Request timed out"
+    return str(e) or type(e).__name__
+
+
+def _output_path(pdf_path: Path, output_dir: Path) -> Path:
+    """Path of the JSON file extracted from pdf_path."""
+    return output_dir / pdf_path.with_suffix('.json').name
+
+
+def _save_invoice(
+    pdf_path: Path,
+    invoice_data: dict,
+    output_dir: Path,
+    writer: _ResultWriter,
+    digest: Optional[str] = None,
+    cached: bool = False
+) -> dict:
+    """
+    Hand extracted invoice data to the writer thread.
+    
+    Args:
+        digest: Content hash of the PDF, to cache a fresh extraction under
+        cached: True if invoice_data came from the extraction cache
+    
+    Returns:
+        Result entry for the batch summary
+    """
+    writer.submit(_output_path(pdf_path, output_dir), invoice_data, None if cached else digest)
+    
+    print(f"  ✓ {'Cached' if cached else 'Extracted'}: {pdf_path.name}")
+    print(f"  - Vendor: {invoice_data.get('vendor')}")
+    print(f"  - Invoice: {invoice_data.get('invoice_number')}")
+    print(f"  - Total: {invoice_data.get('total_amount')} {invoice_data.get('currency')}")
+    
+    return {
+        'file': pdf_path.name,
+        'status': 'success',
+        'data': invoice_data
+    }
+
+
+def _collect_results(
+    results: Dict[Path, dict],
+    skipped: List[Path],
+    output_dir: Path,
+    writer: _ResultWriter
+) -> List[dict]:
+    """
+    Sort results by file name, marking invoices whose file could not be written.
+    
+    PDFs skipped on resume are listed with status 'skipped', so the summary
+    of a resumed run still covers the whole folder.
+    """
+    results = {
+        **{pdf_path: {'file': pdf_path.name, 'status': 'skipped'} for pdf_path in skipped},
+        **results
+    }
+    collected = []
+    for pdf_path in sorted(results):
+        result = results[pdf_path]
+        error = writer.errors.get(_output_path(pdf_path, output_dir))
+        if error is not None:
+            result = {'file': pdf_path.name, 'status': 'error', 'error': error}
+        collected.append(result)
+    return collected
+
+
+def _save_summary(results: List[dict], output_dir: Path):
+    """Print and save the batch summary."""
     successful = sum(1 for r in results if r['status'] == 'success')
-    failed = len(results) - successful
+    skipped = sum(1 for r in results if r['status'] == 'skipped')
+    failed = len(results) - successful - skipped
     
     print("\n" + "="*60)
     print("BATCH PROCESSING COMPLETE")
     print("="*60)
     print(f"Total: {len(results)}")
     print(f"Success: {successful}")
+    print(f"Skipped (already extracted): {skipped}")
     print(f"Failed: {failed}")
     print("="*60)
     
     # Save summary
     summary_path = output_dir / "batch_summary.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    _write_file(summary_path, json_dumps(results, indent=True))
     print(f"\n✓ Summary saved: {summary_path}")
 
 
+async def _upload_worker(
+    client: AsyncLibreChatInvoiceExtractor,
+    upload_q: asyncio.Queue,
+    extract_q: asyncio.Queue,
+    cache: Optional[_ExtractionCache],
+    output_dir: Path,
+    writer: _ResultWriter,
+    results: dict
+):
+    """Upload stage: pdf_path -> (pdf_path, digest, file_data)."""
+    while True:
+        pdf_path = await upload_q.get()
+        try:
+            print(f"\nProcessing: {pdf_path.name}")
+            digest = None
+            if cache is not None:
+                # Hashing reads the whole file, keep it off the event loop
+                digest, cached = await asyncio.to_thread(cache.lookup, pdf_path)
+                if cached is not None:
+                    results[pdf_path] = _save_invoice(pdf_path, cached, output_dir, writer, cached=True)
+                    continue
+            
+            file_data = await client.upload_file(str(pdf_path))
+            if file_data:
+                await extract_q.put((pdf_path, digest, file_data))
+            else:
+                print(f"  ❌ {pdf_path.name}: Upload failed")
+        except Exception as e:
+            error = _error_message(e)
+            print(f"  ❌ {pdf_path.name}: Error: {error}")
+            results[pdf_path] = {'file': pdf_path.name, 'status': 'error', 'error': error}
+        finally:
+            upload_q.task_done()
+
+
+async def _extract_one(
+    client: AsyncLibreChatInvoiceExtractor,
+    pdf_path: Path,
+    digest: Optional[str],
+    file_data: dict,
+    vendors: Mapping[str, str],
+    prompt: str,
+    output_dir: Path,
+    writer: _ResultWriter,
+    results: dict
+):
+    """Extract a single uploaded invoice and hand it to the writer thread."""
+    try:
+        invoice_data = await client.extract_invoice(file_data, vendors, prompt=prompt)
+        if invoice_data:
+            results[pdf_path] = _save_invoice(pdf_path, invoice_data, output_dir, writer, digest)
+        else:
+            print(f"  ❌ {pdf_path.name}: Extraction failed")
+    except Exception as e:
+        error = _error_message(e)
+        print(f"  ❌ {pdf_path.name}: Error: {error}")
+        results[pdf_path] = {'file': pdf_path.name, 'status': 'error', 'error': error}
+
+
+async def _extract_dispatcher(
+    client: AsyncLibreChatInvoiceExtractor,
+    extract_q: asyncio.Queue,
+    vendors: Mapping[str, str],
+    prompt: str,
+    output_dir: Path,
+    writer: _ResultWriter,
+    results: dict,
+    concurrency: int
+):
+    """
+    Extraction stage: (pdf_path, digest, file_data) -> (output_path, invoice_data).
+    
+    Every invoice is extracted in its own task, at most `concurrency` at
+    once, so a slow invoice never holds up the others.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    
+    async def run(pdf_path, digest, file_data):
+        try:
+            await _extract_one(client, pdf_path, digest, file_data, vendors, prompt, output_dir, writer, results)
+        finally:
+            slots.release()
+            extract_q.task_done()
+    
+    while True:
+        item = await extract_q.get()
+        await slots.acquire()
+        task = asyncio.create_task(run(*item))
+        # Keep a reference until the task finishes
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+
+async def _process_invoice_folder_async(
+    folder_path: str,
+    vendors_file: str,
+    librechat_url: str,
+    email: str,
+    password: str,
+    output_folder: str = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    resume: bool = True,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+    pretty: bool = False
+) -> Optional[Tuple[List[dict], Path]]:
+    """
+    asyncio implementation of process_invoice_folder().
+    
+    PDFs flow through three stages connected by queues, so disk
+    reads/uploads, LLM extraction and result writes overlap:
+    
+        upload_q -> uploaders -> extract_q -> extraction tasks -> writer thread
+    """
+    # Up to `concurrency` uploads and `concurrency` extractions hold a
+    # connection at once
+    async with AsyncLibreChatInvoiceExtractor(librechat_url, pool_size=concurrency * 2) as client:
+        # Login
+        print(f"Logging in to {librechat_url}...")
+        if not await client.login(email, password):
+            print("❌ Login failed")
+            return None
+        
+        loaded = _load_batch(folder_path, vendors_file, output_folder, resume)
+        if loaded is None:
+            return None
+        vendors, pdfs, skipped, output_dir = loaded
+        
+        # The prompt only depends on the vendors, so build it once per batch
+        prompt = client.build_prompt(vendors)
+        
+        # Bounded queues give backpressure between the stages
+        upload_q = asyncio.Queue(maxsize=concurrency * 2)
+        extract_q = asyncio.Queue(maxsize=concurrency * 2)
+        results = {}
+        
+        with _open_cache(cache_dir, prompt, read=resume) as cache, _ResultWriter(cache, pretty) as writer:
+            workers = [
+                *(asyncio.create_task(_upload_worker(
+                    client, upload_q, extract_q, cache, output_dir, writer, results))
+                  for _ in range(concurrency)),
+                asyncio.create_task(_extract_dispatcher(
+                    client, extract_q, vendors, prompt, output_dir, writer, results,
+                    concurrency)),
+            ]
+            
+            for pdf_path in pdfs:
+                await upload_q.put(pdf_path)
+            
+            # Drain the stages in order, then stop the workers
+            await upload_q.join()
+            await extract_q.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    return _collect_results(results, skipped, output_dir, writer), output_dir
+
+
+def _process_one(
+    client: LibreChatInvoiceExtractor,
+    pdf_path: Path,
+    vendors: Mapping[str, str],
+    prompt: str,
+    output_dir: Path,
+    writer: _ResultWriter,
+    cache: Optional[_ExtractionCache]
+) -> Optional[dict]:
+    """
+    Upload, extract and save a single invoice (thread pool worker).
+    
+    Returns:
+        Result entry for the batch summary, or None if upload/extraction failed
+    """
+    print(f"\nProcessing: {pdf_path.name}")
+    
+    # Serve duplicate PDFs from the extraction cache
+    digest = None
+    if cache is not None:
+        digest, cached = cache.lookup(pdf_path)
+        if cached is not None:
+            return _save_invoice(pdf_path, cached, output_dir, writer, cached=True)
+    
+    # Upload PDF
+    file_data = client.upload_file(str(pdf_path))
+    if not file_data:
+        print(f"  ❌ {pdf_path.name}: Upload failed")
+        return None
+    
+    # Extract data
+    invoice_data = client.extract_invoice(file_data, vendors, prompt=prompt)
+    if not invoice_data:
+        print(f"  ❌ {pdf_path.name}: Extraction failed")
+        return None
+    
+    return _save_invoice(pdf_path, invoice_data, output_dir, writer, digest)
+
+
+def _process_invoice_folder_threaded(
+    folder_path: str,
+    vendors_file: str,
+    librechat_url: str,
+    email: str,
+    password: str,
+    output_folder: str = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    resume: bool = True,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+    pretty: bool = False
+) -> Optional[Tuple[List[dict], Path]]:
+    """
+    Thread pool implementation of process_invoice_folder().
+    
+    Uploads and extractions are network-bound and release the GIL, so
+    `concurrency` worker threads each process one invoice at a time. PDFs
+    are submitted as workers free up, keeping at most 2 * concurrency
+    futures pending instead of one per file.
+    """
+    client = LibreChatInvoiceExtractor(librechat_url)
+    
+    # Login
+    print(f"Logging in to {librechat_url}...")
+    if not client.login(email, password):
+        print("❌ Login failed")
+        return None
+    
+    loaded = _load_batch(folder_path, vendors_file, output_folder, resume)
+    if loaded is None:
+        return None
+    vendors, pdfs, skipped, output_dir = loaded
+    
+    # The prompt only depends on the vendors, so build it once per batch
+    prompt = client.build_prompt(vendors)
+    
+    results = {}
+    with _open_cache(cache_dir, prompt, read=resume) as cache, _ResultWriter(cache, pretty) as writer, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {}
+        pending = iter(pdfs)
+        while True:
+            # Top up the submissions from the lazy PDF iterator
+            for pdf_path in itertools.islice(pending, concurrency * 2 - len(futures)):
+                future = executor.submit(
+                    _process_one, client, pdf_path, vendors, prompt, output_dir, writer, cache
+                )
+                futures[future] = pdf_path
+            if not futures:
+                break
+            
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                pdf_path = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = _error_message(e)
+                    print(f"  ❌ {pdf_path.name}: Error: {error}")
+                    result = {'file': pdf_path.name, 'status': 'error', 'error': error}
+                if result is not None:
+                    results[pdf_path] = result
+    
+    return _collect_results(results, skipped, output_dir, writer), output_dir
+
+
+def _open_cache(cache_dir: Optional[Path], prompt: str, read: bool = True):
+    """
+    Context manager yielding the extraction cache, or None if disabled.
+    
+    The cache is optional, so a cache folder or database that cannot be
+    opened (e.g. a read-only home directory) only disables it.
+    """
+    if cache_dir is None:
+        return contextlib.nullcontext()
+    try:
+        return _ExtractionCache(Path(cache_dir), prompt, read)
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠ Extraction cache disabled, could not open {cache_dir}: {e}")
+        return contextlib.nullcontext()
+
+
+def process_invoice_folder(
+    folder_path: str,
+    vendors_file: str,
+    librechat_url: str,
+    email: str,
+    password: str,
+    output_folder: str = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    use_threads: bool = False,
+    resume: bool = True,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+    pretty: bool = False
+):
+    """
+    Process all PDF invoices in a folder.
+    
+    Args:
+        folder_path: Path to folder containing PDF invoices
+        vendors_file: Path to JSON file with vendor mappings
+        librechat_url: LibreChat server URL
+        email: Login email
+        password: Login password
+        output_folder: Optional output folder (defaults to same as input)
+        concurrency: Maximum number of invoices processed at once
+        use_threads: Use the thread pool even if aiohttp is available
+        resume: Skip PDFs that already have a JSON result in the output folder
+            and serve cached extractions; False reprocesses every PDF
+        cache_dir: Folder of the content-hash extraction cache (None disables it)
+        pretty: Indent the per-invoice JSON files (compact by default)
+    """
+    if use_threads or aiohttp is None:
+        outcome = _process_invoice_folder_threaded(
+            folder_path=folder_path,
+            vendors_file=vendors_file,
+            librechat_url=librechat_url,
+            email=email,
+            password=password,
+            output_folder=output_folder,
+            concurrency=concurrency,
+            resume=resume,
+            cache_dir=cache_dir,
+            pretty=pretty
+        )
+    else:
+        outcome = asyncio.run(_process_invoice_folder_async(
+            folder_path=folder_path,
+            vendors_file=vendors_file,
+            librechat_url=librechat_url,
+            email=email,
+            password=password,
+            output_folder=output_folder,
+            concurrency=concurrency,
+            resume=resume,
+            cache_dir=cache_dir,
+            pretty=pretty
+        ))
+    
+    if outcome is not None:
+        _save_summary(*outcome)
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Batch process PDF invoices"
@@ -158,6 +755,38 @@ def main():
         '--output',
         help='Output folder (default: same as input folder)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=_positive_int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Number of invoices processed in parallel (default: {DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--threads',
+        action='store_true',
+        help='Use a thread pool instead of asyncio (default when aiohttp is not installed)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reprocess PDFs that already have a JSON result in the output folder, '
+             'ignoring (but refreshing) the extraction cache'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=str(DEFAULT_CACHE_DIR),
+        help=f'Extraction cache folder, keyed by PDF content hash (default: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or update the extraction cache'
+    )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='Write indented per-invoice JSON files (default: compact)'
+    )
     
     args = parser.parse_args()
     
@@ -167,7 +796,12 @@ def main():
         librechat_url=args.url,
         email=args.email,
         password=args.password,
-        output_folder=args.output
+        output_folder=args.output,
+        concurrency=args.concurrency,
+        use_threads=args.threads,
+        resume=not args.force,
+        cache_dir=None if args.no_cache else Path(args.cache_dir),
+        pretty=args.pretty
     )
 
 
@@ -10,19 +10,189 @@ Usage:
 
 Requirements:
     pip install requests
+    pip install aiohttp  # optional, for AsyncLibreChatInvoiceExtractor
+    pip install orjson   # optional, faster JSON parsing/serialization
+    pip install requests-toolbelt  # optional, streams uploads from disk
+    pip install "urllib3[zstd]"    # optional, zstd-compressed responses
 """
 
 import argparse
+import collections.abc
+import functools
 import json
 import os
+import re
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Mapping, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 
+try:
+    import aiohttp
+except ImportError:  # aiohttp is only needed for the async client
+    aiohttp = None
 
-class LibreChatInvoiceExtractor:
-    """Client for LibreChat invoice extraction API."""
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:  # requests buffers the multipart body in memory instead
+    MultipartEncoder = None
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
+
+
+if orjson is not None:
+    json_loads = orjson.loads
+    
+    def json_dumps(obj, indent: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes (2-space indented if indent)."""
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+else:
+    json_loads = json.loads
+    
+    def json_dumps(obj, indent: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes (2-space indented if indent)."""
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+# Keep-alive connections per async client; the batch script sizes it from
+# its --concurrency instead
+DEFAULT_POOL_SIZE = 64
+
+# Read buffer used when streaming PDFs to the server
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+
+# Read size for the SSE response stream (requests defaults to 512 bytes)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Seconds allowed for establishing a connection. Responses get no overall
+# limit: queued extractions on a busy backend can stream for many minutes.
+CONNECT_TIMEOUT = 30
+
+# PDF files start with this marker; readers accept it within the first 1 KB
+PDF_MAGIC = b'%PDF-'
+PDF_MAGIC_WINDOW = 1024
+
+# Markdown code fence around a model answer, e.g. ```json ... ```
+_FENCE_RE = re.compile(r'^```[\w-]*\s*\n(.*?)\n```\s*$', re.DOTALL)
+
+
+# Extraction prompt; the known vendor list is inserted between head and tail.
+# Both parts are static, so every request shares the same prompt prefix.
+PROMPT_HEAD = """Extract all invoice information from the provided text and return a JSON object with the following structure. Follow these rules strictly:
+
+1. Extract ONLY from the provided context - never guess or infer missing data
+2. Return null for any field not explicitly present in the text
+3. Follow the exact schema below
+4. Use ISO 8601 dates (YYYY-MM-DD)
+5. Use ISO 4217 currency codes (e.g., "EUR", "USD")
+6. Use dot as decimal separator for all numbers (e.g., 1234.56)
+7. Do not add explanations, prose, or additional fields
+8. Output JSON only
+
+JSON Schema:
+{
+  "vendor": null,
+  "vendor_number": null,
+  "invoice_number": null,
+  "invoice_date": null,
+  "due_date": null,
+  "currency": null,
+  "total_amount": null,
+  "vat_amount": null,
+  "vat_rate": null,
+  "item_summary": null,
+  "line_items": [
+    {
+      "description": null,
+      "quantity": null,
+      "unit_price": null,
+      "amount": null
+    }
+  ]
+}
+
+Field Definitions:
+- vendor: The name of the company/person issuing the invoice
+- vendor_number: The supplier/vendor number (Lieferantennummer) if present
+- invoice_number: The invoice reference/number
+- invoice_date: The date the invoice was issued (YYYY-MM-DD)
+- due_date: The payment due date (YYYY-MM-DD)
+- currency: ISO 4217 currency code (e.g., "EUR", "USD", "GBP")
+- total_amount: Total invoice amount including VAT (number with dot decimal)
+- vat_amount: Total VAT/tax amount (number with dot decimal)
+- vat_rate: VAT/tax rate as a percentage (e.g., 19 for 19%, 7 for 7%)
+- item_summary: Brief summary of all line items (max 15 words, e.g., "Office chairs, desks, and supplies")
+- line_items: Array of invoice line items, each with:
+  - description: Item/service description
+  - quantity: Number of units (number)
+  - unit_price: Price per unit (number with dot decimal)
+  - amount: Total for this line (number with dot decimal)
+
+Return ONLY the JSON object. Do not include any markdown code blocks, explanations, or additional text.
+
+If vendor numbers are not on invoices, provide them in the prompt:
+
+Known vendor numbers:
+"""
+
+PROMPT_TAIL = """
+
+If you identify the vendor name, use the corresponding vendor_number from the list above."""
+
+
+def _render_vendor_list(vendor_mappings: Mapping[str, str]) -> str:
+    """Render vendor mappings as the prompt's "- name: number" list."""
+    return "\n".join([
+        f"- {name}: {number}" 
+        for name, number in vendor_mappings.items()
+    ])
+
+
+class _VendorMappings(collections.abc.Mapping):
+    """
+    Read-only vendor mappings created by this module.
+    
+    Unlike a MappingProxyType, which is a live view of a dict its creator can
+    still change, the underlying dict is private, so the contents are fixed
+    and build_prompt() can memoize the prompt by identity.
+    """
+    
+    __slots__ = ('_data',)
+    
+    def __init__(self, data: Mapping[str, str]):
+        self._data = dict(data)
+    
+    def __getitem__(self, name: str) -> str:
+        return self._data[name]
+    
+    def __iter__(self):
+        return iter(self._data)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def items(self):
+        return self._data.items()
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+
+class _InvoiceExtractorBase:
+    """Request building and response parsing shared by the sync and async clients."""
+    
+    # Number of distinct vendor lists whose rendered prompt is kept
+    PROMPT_CACHE_SIZE = 8
     
     def __init__(self, base_url: str = "http://localhost:3080"):
         """
@@ -32,10 +202,315 @@ class LibreChatInvoiceExtractor:
             base_url: LibreChat server URL (default: http://localhost:3080)
         """
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        # Conversation metadata of the most recently finished extraction
         self.conversation_id = None
         self.parent_message_id = None
+        self._prompt_cache: Dict[int, tuple] = {}
+    
+    def build_prompt(self, vendor_mappings: Mapping[str, str]) -> str:
+        """
+        Return the extraction prompt for the given vendor mappings.
+        
+        Prompts for mappings returned by load_vendor_mappings() are memoized
+        by identity (they cannot change), so a batch renders the prompt once
+        and every request shares an identical prefix, which lets the backend
+        reuse its prompt cache. Other mappings are rendered on every call:
+        keying them by their contents costs as much as rendering and fails
+        for unhashable values.
+        
+        Args:
+            vendor_mappings: Dict mapping vendor names to vendor numbers
+            
+        Returns:
+            Prompt text
+        """
+        if not isinstance(vendor_mappings, _VendorMappings):
+            return self._render_prompt(vendor_mappings)
+        
+        key = id(vendor_mappings)
+        entry = self._prompt_cache.get(key)
+        # Entries keep a reference to their mapping, so the id cannot be
+        # reused by another object while the entry exists
+        if entry is not None and entry[0] is vendor_mappings:
+            return entry[1]
+        
+        if len(self._prompt_cache) >= self.PROMPT_CACHE_SIZE:
+            self._prompt_cache.clear()
+        prompt = self._render_prompt(vendor_mappings)
+        self._prompt_cache[key] = (vendor_mappings, prompt)
+        return prompt
+    
+    def _render_prompt(self, vendor_mappings: Mapping[str, str]) -> str:
+        """
+        Build the extraction prompt for the given vendor mappings.
+        
+        Args:
+            vendor_mappings: Dict mapping vendor names to vendor numbers
+            
+        Returns:
+            Prompt text
+        """
+        return PROMPT_HEAD + _render_vendor_list(vendor_mappings) + PROMPT_TAIL
+    
+    def _check_pdf(self, file_path: Path) -> bool:
+        """
+        Cheap local check that a file looks like a PDF.
+        
+        Avoids a wasted upload and LLM call for empty or non-PDF files.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            True if the file looks like a PDF
+        """
+        if file_path.stat().st_size == 0:
+            print(f"✗ File is empty: {file_path}")
+            return False
+        with open(file_path, 'rb', buffering=0) as f:
+            head = f.read(PDF_MAGIC_WINDOW)
+        if PDF_MAGIC not in head:
+            print(f"✗ Not a PDF file: {file_path}")
+            return False
+        return True
+    
+    def _build_payload(
+        self,
+        file_data: Dict,
+        prompt: str,
+        model: str,
+        conversation_id: Optional[str]
+    ) -> Dict:
+        """
+        Build the /api/ask/agents request body for an uploaded file.
+        
+        A new conversation always starts from the null parent message, so
+        concurrent extractions never depend on each other. Only continuing a
+        conversation chains onto the client's last message.
+        """
+        parent_message_id = self.parent_message_id if conversation_id else None
+        return {
+            "endpoint": "agents",
+            "model": model,
+            "text": prompt,
+            "conversationId": conversation_id or "new",
+            "parentMessageId": parent_message_id or "00000000-0000-0000-0000-000000000000",
+            "files": [
+                {
+                    "file_id": file_data.get("file_id"),
+                    "filepath": file_data.get("filepath"),
+                    "filename": file_data.get("filename"),
+                    "type": file_data.get("type"),
+                    "height": file_data.get("height"),
+                    "width": file_data.get("width")
+                }
+            ]
+        }
+    
+    def _store_metadata(self, stream: "_StreamAccumulator"):
+        """
+        Store the conversation metadata of a finished extraction stream.
+        """
+        if stream.conversation_id is not None:
+            self.conversation_id = stream.conversation_id
+        if stream.message_id is not None:
+            self.parent_message_id = stream.message_id
+    
+    def _parse_invoice_json(self, full_response: str) -> Optional[Dict]:
+        """
+        Parse the model's final answer into invoice data.
+        
+        Args:
+            full_response: Complete response text from the stream
+            
+        Returns:
+            Extracted invoice data as dict or None if failed
+        """
+        try:
+            # The model should return pure JSON, but handle markdown code blocks just in case
+            json_text = full_response.strip()
+            m = _FENCE_RE.match(json_text)
+            if m:
+                # Extract JSON from markdown code block
+                json_text = m.group(1)
+            
+            invoice_data = json_loads(json_text)
+            return invoice_data
+        except json.JSONDecodeError as e:
+            print(f"✗ Failed to parse JSON response: {e}")
+            print(f"Raw response: {full_response}")
+            return None
+
+
+class _StreamAccumulator:
+    """
+    Collects the response text and conversation metadata from an
+    /api/ask/agents SSE stream.
+    
+    Events carrying a top-level ``text`` field repeat everything streamed so
+    far, so parsing each of them is O(N^2) in the response length. Events
+    with a text, conversationId or messageId key are instead recognised with
+    a substring test and kept as raw bytes; result() parses them newest
+    first until every field has been found at the top level, normally with
+    a single parse. Incremental ``delta`` events are appended to a list and
+    joined instead.
+    """
+    
+    # Top-level fields read from the stream and the substrings that guard
+    # them; '"text":' only matches the key, not "text" as a value (e.g. a
+    # content part's "type": "text")
+    FIELD_KEYS = {'text': b'"text":', 'conversationId': b'"conversationId"', 'messageId': b'"messageId"'}
+    
+    # Events kept unparsed before the newest ones are resolved; bounds
+    # memory, since cumulative text events grow with the response
+    PENDING_LIMIT = 64
+    
+    def __init__(self):
+        self.conversation_id = None
+        self.message_id = None
+        self._text = None
+        self._pending = []
+        self._parts = []
+    
+    @staticmethod
+    def _parse(data_bytes: bytes) -> Optional[Dict]:
+        """Parse an event object, or return None if it is not one."""
+        try:
+            event = json_loads(data_bytes)
+        except json.JSONDecodeError:  # orjson.JSONDecodeError is a subclass
+            return None
+        return event if isinstance(event, dict) else None
+    
+    def _resolve(self):
+        """Parse the pending events, newest first, until every field is found."""
+        found = {}
+        for data_bytes in reversed(self._pending):
+            missing = [key for key in self.FIELD_KEYS if key not in found]
+            if not missing:
+                break
+            if not any(self.FIELD_KEYS[key] in data_bytes for key in missing):
+                continue
+            event = self._parse(data_bytes)
+            if event is None:
+                continue
+            for key in missing:
+                # Summary events may only carry the text nested, so only a
+                # top-level string counts
+                if key in event and (key != 'text' or isinstance(event[key], str)):
+                    found[key] = event[key]
+        self._pending.clear()
+        
+        if 'text' in found:
+            self._text = found['text']
+        if 'conversationId' in found:
+            self.conversation_id = found['conversationId']
+        if 'messageId' in found:
+            self.message_id = found['messageId']
+    
+    def feed(self, data_bytes: bytes):
+        """Consume one SSE ``data:`` payload."""
+        if b'"delta"' in data_bytes:
+            event = self._parse(data_bytes)
+            if event is None:
+                return
+            if 'text' not in event:
+                delta = (event.get('data') or {}).get('delta') or {}
+                for part in delta.get('content') or []:
+                    if part.get('type') == 'text' and part.get('text'):
+                        self._parts.append(part['text'])
+                # Already parsed: only keep it if _resolve() has a field to find
+                if not any(key in event for key in self.FIELD_KEYS):
+                    return
+        
+        if any(guard in data_bytes for guard in self.FIELD_KEYS.values()):
+            self._pending.append(data_bytes)
+            if len(self._pending) >= self.PENDING_LIMIT:
+                self._resolve()
+    
+    def result(self) -> str:
+        """Return the complete response text (and resolve the conversation metadata)."""
+        self._resolve()
+        if self._text is not None:
+            return self._text
+        return "".join(self._parts)
+
+
+async def _iter_stream_lines(content: "aiohttp.StreamReader") -> AsyncIterator[bytes]:
+    """
+    Yield the lines of an aiohttp response body.
+    
+    Reads whatever the connection has buffered at once instead of line by
+    line, and has no per-line size limit (StreamReader.readline() raises
+    for lines longer than its buffer, which long SSE events can exceed).
+    """
+    parts = []
+    async for chunk in content.iter_any():
+        start = 0
+        while True:
+            end = chunk.find(b'\n', start)
+            if end == -1:
+                break
+            if parts:
+                parts.append(chunk[start:end])
+                yield b''.join(parts)
+                parts.clear()
+            else:
+                yield chunk[start:end]
+            start = end + 1
+        if start < len(chunk):
+            parts.append(chunk[start:])
+    if parts:
+        yield b''.join(parts)
+
+
+class LibreChatInvoiceExtractor(_InvoiceExtractorBase):
+    """
+    Client for LibreChat invoice extraction API.
+    
+    Safe to share between threads: each thread gets its own requests.Session
+    (sessions are not safe for concurrent streaming), and all of them share
+    one cookie jar so a single login() authenticates every thread.
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:3080"):
+        """
+        Initialize the client.
         
+        Args:
+            base_url: LibreChat server URL (default: http://localhost:3080)
+        """
+        super().__init__(base_url)
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """requests.Session for the calling thread."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._create_session()
+        return session
+    
+    def _create_session(self) -> requests.Session:
+        """
+        Create a keep-alive session that shares the client's cookie jar.
+        
+        A session is only used by one thread, one request at a time, so the
+        adapter's default pool (one connection per host) is enough.
+        """
+        session = requests.Session()
+        session.cookies = self.cookies
+        # Retry connections that could not be established. Every call is a POST,
+        # which urllib3 never replays once it reached the server (read errors,
+        # status codes), so uploads and extractions are never duplicated.
+        adapter = HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.3))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        # Advertise every encoding urllib3 can decode here (gzip and deflate,
+        # plus br/zstd when their optional packages are installed)
+        session.headers.update({'Connection': 'keep-alive', 'Accept-Encoding': ACCEPT_ENCODING})
+        return session
+    
     def login(self, email: str, password: str) -> bool:
         """
         Authenticate with LibreChat.
@@ -74,8 +549,10 @@ class LibreChatInvoiceExtractor:
         if not file_path.exists():
             print(f"✗ File not found: {file_path}")
             return None
+        if not self._check_pdf(file_path):
+            return None
         
-        with open(file_path, 'rb') as f:
+        with open(file_path, 'rb', buffering=UPLOAD_BUFFER_SIZE) as f:
             files = {
                 'file': (file_path.name, f, 'application/pdf')
             }
@@ -84,11 +561,20 @@ class LibreChatInvoiceExtractor:
                 'endpoint': 'agents'
             }
             
-            response = self.session.post(
-                f"{self.base_url}/api/files/upload",
-                files=files,
-                data=data
-            )
+            if MultipartEncoder is not None:
+                # Stream the PDF from disk instead of building the body in memory
+                encoder = MultipartEncoder(fields={**data, **files})
+                response = self.session.post(
+                    f"{self.base_url}/api/files/upload",
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type}
+                )
+            else:
+                response = self.session.post(
+                    f"{self.base_url}/api/files/upload",
+                    files=files,
+                    data=data
+                )
         
         if response.status_code == 200:
             file_data = response.json()
@@ -102,9 +588,10 @@ class LibreChatInvoiceExtractor:
     def extract_invoice(
         self,
         file_data: Dict,
-        vendor_mappings: Dict[str, str],
+        vendor_mappings: Mapping[str, str],
         model: str = "qwen2.5-3b-instruct-invoice-extractor-gtx1650",
-        conversation_id: Optional[str] = None
+        conversation_id: Optional[str] = None,
+        prompt: Optional[str] = None
     ) -> Optional[Dict]:
         """
         Extract invoice data from uploaded file.
@@ -114,94 +601,14 @@ class LibreChatInvoiceExtractor:
             vendor_mappings: Dict mapping vendor names to vendor numbers
             model: Model name to use
             conversation_id: Optional conversation ID to continue
+            prompt: Optional prebuilt prompt from build_prompt()
             
         Returns:
             Extracted invoice data as dict or None if failed
         """
-        # Build vendor list for prompt
-        vendor_list = "\n".join([
-            f"- {name}: {number}" 
-            for name, number in vendor_mappings.items()
-        ])
-        
-        # Construct the extraction prompt
-        prompt = f"""Extract all invoice information from the provided text and return a JSON object with the following structure. Follow these rules strictly:
-
-1. Extract ONLY from the provided context - never guess or infer missing data
-2. Return null for any field not explicitly present in the text
-3. Follow the exact schema below
-4. Use ISO 8601 dates (YYYY-MM-DD)
-5. Use ISO 4217 currency codes (e.g., "EUR", "USD")
-6. Use dot as decimal separator for all numbers (e.g., 1234.56)
-7. Do not add explanations, prose, or additional fields
-8. Output JSON only
-
-JSON Schema:
-{{
-  "vendor": null,
-  "vendor_number": null,
-  "invoice_number": null,
-  "invoice_date": null,
-  "due_date": null,
-  "currency": null,
-  "total_amount": null,
-  "vat_amount": null,
-  "vat_rate": null,
-  "item_summary": null,
-  "line_items": [
-    {{
-      "description": null,
-      "quantity": null,
-      "unit_price": null,
-      "amount": null
-    }}
-  ]
-}}
-
-Field Definitions:
-- vendor: The name of the company/person issuing the invoice
-- vendor_number: The supplier/vendor number (Lieferantennummer) if present
-- invoice_number: The invoice reference/number
-- invoice_date: The date the invoice was issued (YYYY-MM-DD)
-- due_date: The payment due date (YYYY-MM-DD)
-- currency: ISO 4217 currency code (e.g., "EUR", "USD", "GBP")
-- total_amount: Total invoice amount including VAT (number with dot decimal)
-- vat_amount: Total VAT/tax amount (number with dot decimal)
-- vat_rate: VAT/tax rate as a percentage (e.g., 19 for 19%, 7 for 7%)
-- item_summary: Brief summary of all line items (max 15 words, e.g., "Office chairs, desks, and supplies")
-- line_items: Array of invoice line items, each with:
-  - description: Item/service description
-  - quantity: Number of units (number)
-  - unit_price: Price per unit (number with dot decimal)
-  - amount: Total for this line (number with dot decimal)
-
-Return ONLY the JSON object. Do not include any markdown code blocks, explanations, or additional text.
-
-If vendor numbers are not on invoices, provide them in the prompt:
-
-Known vendor numbers:
-{vendor_list}
-
-If you identify the vendor name, use the corresponding vendor_number from the list above."""
-
-        # Prepare the message payload
-        payload = {
-            "endpoint": "agents",
-            "model": model,
-            "text": prompt,
-            "conversationId": conversation_id or "new",
-            "parentMessageId": self.parent_message_id or "00000000-0000-0000-0000-000000000000",
-            "files": [
-                {
-                    "file_id": file_data.get("file_id"),
-                    "filepath": file_data.get("filepath"),
-                    "filename": file_data.get("filename"),
-                    "type": file_data.get("type"),
-                    "height": file_data.get("height"),
-                    "width": file_data.get("width")
-                }
-            ]
-        }
+        if prompt is None:
+            prompt = self.build_prompt(vendor_mappings)
+        payload = self._build_payload(file_data, prompt, model, conversation_id)
         
         print(f"✓ Sending extraction request with model: {model}")
         
@@ -218,68 +625,227 @@ If you identify the vendor name, use the corresponding vendor_number from the li
             return None
         
         # Parse streaming response
-        full_response = ""
-        for line in response.iter_lines():
-            if line:
-                line_text = line.decode('utf-8')
-                if line_text.startswith('data: '):
-                    data_str = line_text[6:]  # Remove 'data: ' prefix
-                    if data_str == '[DONE]':
-                        break
-                    try:
-                        data = json.loads(data_str)
-                        # Accumulate text from streaming response
-                        if 'text' in data:
-                            full_response = data['text']
-                        # Store conversation metadata
-                        if 'conversationId' in data:
-                            self.conversation_id = data['conversationId']
-                        if 'messageId' in data:
-                            self.parent_message_id = data['messageId']
-                    except json.JSONDecodeError:
-                        continue
+        stream = _StreamAccumulator()
+        feed = stream.feed  # bound once, called for every event
+        for line in response.iter_lines(chunk_size=STREAM_CHUNK_SIZE):
+            # Lines stay bytes; only the final response text is ever decoded
+            if line.startswith(b'data: '):
+                data_bytes = line[6:]  # Remove 'data: ' prefix
+                if data_bytes == b'[DONE]':
+                    break
+                feed(data_bytes)
+        full_response = stream.result()
+        self._store_metadata(stream)
         
         print("✓ Extraction complete")
+        return self._parse_invoice_json(full_response)
+
+
+class AsyncLibreChatInvoiceExtractor(_InvoiceExtractorBase):
+    """
+    asyncio client for LibreChat invoice extraction API.
+    
+    Same interface as LibreChatInvoiceExtractor, but every network call is a
+    coroutine so many invoices can be uploaded and extracted concurrently
+    over one aiohttp session. Use as an async context manager (or call
+    close()) so the session is released.
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:3080", pool_size: int = DEFAULT_POOL_SIZE):
+        """
+        Initialize the client.
         
-        # Parse the JSON response from the model
-        try:
-            # The model should return pure JSON, but handle markdown code blocks just in case
-            json_text = full_response.strip()
-            if json_text.startswith('```'):
-                # Extract JSON from markdown code block
-                lines = json_text.split('\n')
-                json_text = '\n'.join(lines[1:-1])
+        Args:
+            base_url: LibreChat server URL (default: http://localhost:3080)
+            pool_size: Maximum number of simultaneous connections; size it for
+                the number of uploads and extractions in flight
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncLibreChatInvoiceExtractor requires aiohttp: pip install aiohttp")
+        super().__init__(base_url)
+        self.pool_size = pool_size
+        self._session = None
+    
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """
+        Shared aiohttp session, created lazily inside the running event loop.
+        
+        aiohttp already sends an Accept-Encoding header listing every encoding
+        it can decode and decompresses responses transparently. Only connecting
+        is timed out; aiohttp's default 5 minute total timeout would abort
+        long extraction streams.
+        """
+        if self._session is None:
+            # unsafe=True so cookies are also kept for IP-address hosts
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size,
+                    limit_per_host=self.pool_size,
+                    keepalive_timeout=60
+                ),
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the underlying HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def login(self, email: str, password: str) -> bool:
+        """
+        Authenticate with LibreChat.
+        
+        Args:
+            email: User email
+            password: User password
             
-            invoice_data = json.loads(json_text)
-            return invoice_data
-        except json.JSONDecodeError as e:
-            print(f"✗ Failed to parse JSON response: {e}")
-            print(f"Raw response: {full_response}")
+        Returns:
+            True if login successful
+        """
+        async with self.session.post(
+            f"{self.base_url}/api/auth/login",
+            json={"email": email, "password": password}
+        ) as response:
+            if response.status == 200:
+                print("✓ Login successful")
+                return True
+            print(f"✗ Login failed: {response.status}")
+            print(await response.text())
+            return False
+    
+    async def upload_file(self, file_path: str) -> Optional[Dict]:
+        """
+        Upload a file to LibreChat (similar to "Upload as Text").
+        
+        Args:
+            file_path: Path to the PDF file
+            
+        Returns:
+            File metadata dict or None if failed
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            print(f"✗ File not found: {file_path}")
+            return None
+        if not self._check_pdf(file_path):
             return None
+        
+        # FormData streams file objects, so the PDF is never fully in memory
+        with open(file_path, 'rb', buffering=UPLOAD_BUFFER_SIZE) as f:
+            form = aiohttp.FormData()
+            # Set endpoint to 'agents' for agent conversations
+            form.add_field('endpoint', 'agents')
+            form.add_field('file', f, filename=file_path.name, content_type='application/pdf')
+            
+            async with self.session.post(
+                f"{self.base_url}/api/files/upload",
+                data=form
+            ) as response:
+                if response.status == 200:
+                    file_data = await response.json()
+                    print(f"✓ File uploaded: {file_data.get('filename')}")
+                    return file_data
+                print(f"✗ File upload failed: {response.status}")
+                print(await response.text())
+                return None
+    
+    async def extract_invoice(
+        self,
+        file_data: Dict,
+        vendor_mappings: Mapping[str, str],
+        model: str = "qwen2.5-3b-instruct-invoice-extractor-gtx1650",
+        conversation_id: Optional[str] = None,
+        prompt: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Extract invoice data from uploaded file.
+        
+        Args:
+            file_data: File metadata from upload_file()
+            vendor_mappings: Dict mapping vendor names to vendor numbers
+            model: Model name to use
+            conversation_id: Optional conversation ID to continue
+            prompt: Optional prebuilt prompt from build_prompt()
+            
+        Returns:
+            Extracted invoice data as dict or None if failed
+        """
+        if prompt is None:
+            prompt = self.build_prompt(vendor_mappings)
+        payload = self._build_payload(file_data, prompt, model, conversation_id)
+        
+        print(f"✓ Sending extraction request with model: {model}")
+        
+        stream = _StreamAccumulator()
+        feed = stream.feed  # bound once, called for every event
+        async with self.session.post(
+            f"{self.base_url}/api/ask/agents",
+            json=payload
+        ) as response:
+            if response.status != 200:
+                print(f"✗ Extraction failed: {response.status}")
+                print(await response.text())
+                return None
+            
+            # Parse streaming response
+            async for line in _iter_stream_lines(response.content):
+                # Lines stay bytes; only the final response text is ever decoded
+                if line.startswith(b'data: '):
+                    data_bytes = line[6:].rstrip()  # Remove 'data: ' prefix and EOL
+                    if data_bytes == b'[DONE]':
+                        break
+                    feed(data_bytes)
+        full_response = stream.result()
+        self._store_metadata(stream)
+        
+        print("✓ Extraction complete")
+        return self._parse_invoice_json(full_response)
+
+
+# Default vendor mappings
+DEFAULT_VENDOR_MAPPINGS = _VendorMappings({
+    "ACME Corp": "V12345",
+    "Global Supplies GmbH": "V67890",
+    "Tech Solutions Ltd": "V24680",
+    "Office Depot": "V13579",
+    "Staples Inc": "V98765"
+})
 
 
-def load_vendor_mappings(vendors_file: Optional[str] = None) -> Dict[str, str]:
+@functools.lru_cache(maxsize=8)
+def _load_vendor_mappings_cached(path: str, mtime: float) -> Mapping[str, str]:
+    """Parse a vendors file; mtime is part of the cache key so edits invalidate it."""
+    return _VendorMappings(json_loads(Path(path).read_bytes()))
+
+
+def load_vendor_mappings(vendors_file: Optional[str] = None) -> Mapping[str, str]:
     """
     Load vendor mappings from file or return defaults.
     
+    Parsed files are cached until their modification time changes, and the
+    result is a read-only mapping so it can be shared safely between threads.
+    
     Args:
         vendors_file: Optional path to JSON file with vendor mappings
         
     Returns:
-        Dict mapping vendor names to vendor numbers
+        Read-only mapping of vendor names to vendor numbers
     """
     if vendors_file and Path(vendors_file).exists():
-        with open(vendors_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    # Default vendor mappings
-    return {
-        "ACME Corp": "V12345",
-        "Global Supplies GmbH": "V67890",
-        "Tech Solutions Ltd": "V24680",
-        "Office Depot": "V13579",
-        "Staples Inc": "V98765"
-    }
+        path = os.path.abspath(vendors_file)
+        return _load_vendor_mappings_cached(path, os.path.getmtime(path))
+    
+    return DEFAULT_VENDOR_MAPPINGS
 
 
 def main():
@@ -357,7 +923,7 @@ def main():
     print("\n" + "="*60)
     print("EXTRACTED INVOICE DATA")
     print("="*60)
-    print(json.dumps(invoice_data, indent=2, ensure_ascii=False))
+    print(json_dumps(invoice_data, indent=True).decode('utf-8'))
     print("="*60)
     
     # Summary
@@ -370,8 +936,8 @@ def main():
     
     # Save to file
     output_path = args.output or str(Path(args.pdf).with_suffix('.json'))
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(invoice_data, f, indent=2, ensure_ascii=False)
+    with open(output_path, 'wb') as f:
+        f.write(json_dumps(invoice_data, indent=True))
     print(f"\n✓ Saved to: {output_path}")
     
     return 0